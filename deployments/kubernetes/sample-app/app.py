@@ -2,8 +2,10 @@
 """
 Sample application that generates metrics and sends them via OTEL
 """
+import os
+import sys
 import time
-import random
+import numpy as np
 from opentelemetry import metrics
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
@@ -52,24 +54,58 @@ methods = ["GET", "POST", "PUT", "DELETE"]
 paths = ["/api/users", "/api/products", "/api/orders", "/health"]
 status_codes = [200, 201, 400, 404, 500]
 
-while True:
-    # Simulate requests
-    method = random.choice(methods)
-    path = random.choice(paths)
-    status = random.choices(status_codes, weights=[70, 10, 10, 5, 5])[0]
-    duration = random.uniform(0.01, 2.0)
-    
+# Build every attribute set once so each recording reuses the same dict
+counter_attrs = {
+    (method, path, status): {"method": method, "path": path, "status": str(status)}
+    for method in methods for path in paths for status in status_codes
+}
+duration_attrs = {
+    (method, path): {"method": method, "path": path}
+    for method in methods for path in paths
+}
+
+# Emit at a fixed rate; the default matches the mean of the old random 0.5-3.0s sleep
+INTERVAL_SECONDS = float(os.environ.get("INTERVAL_SECONDS", "1.75"))
+# Per-request output is only written when DEBUG is set, flushed in batches
+DEBUG = os.environ.get("DEBUG", "").lower() in ("1", "true", "yes")
+FLUSH_EVERY = 100
+
+# Draw random values in batches rather than one Python-level call per request
+BATCH_SIZE = 1024
+rng = np.random.default_rng()
+status_p = np.array([70, 10, 10, 5, 5]) / 100
+
+
+def random_requests():
+    """Yield (method, path, status, duration, active) tuples forever."""
+    while True:
+        yield from zip(
+            rng.choice(methods, size=BATCH_SIZE).tolist(),
+            rng.choice(paths, size=BATCH_SIZE).tolist(),
+            rng.choice(status_codes, size=BATCH_SIZE, p=status_p).tolist(),
+            rng.uniform(0.01, 2.0, size=BATCH_SIZE).tolist(),
+            (rng.random(BATCH_SIZE) > 0.5).tolist(),
+        )
+
+
+next_tick = time.monotonic()
+for count, (method, path, status, duration, active) in enumerate(random_requests(), 1):
     # Record metrics
-    request_counter.add(1, {"method": method, "path": path, "status": str(status)})
-    request_duration.record(duration, {"method": method, "path": path})
+    request_counter.add(1, counter_attrs[(method, path, status)])
+    request_duration.record(duration, duration_attrs[(method, path)])
     
     # Simulate active requests
-    if random.random() > 0.5:
+    if active:
         active_requests.add(1)
     else:
         active_requests.add(-1)
     
-    print(f"Generated: {method} {path} - {status} ({duration:.3f}s)")
+    if DEBUG:
+        sys.stdout.write(f"Generated: {method} {path} - {status} ({duration:.3f}s)\n")
+        if count % FLUSH_EVERY == 0:
+            sys.stdout.flush()
     
-    # Sleep between requests
-    time.sleep(random.uniform(0.5, 3.0))
+    # Sleep until the next deadline so the rate does not drift; after a
+    # stall, resync to now instead of bursting to catch up
+    next_tick = max(next_tick + INTERVAL_SECONDS, time.monotonic())
+    time.sleep(max(0.0, next_tick - time.monotonic()))
@@ -11,6 +11,8 @@ Usage:
 """
 
 import argparse
+import io
+import os
 import re
 import sys
 from dataclasses import dataclass
@@ -18,7 +20,7 @@ from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class BenchmarkMetrics:
     """Parsed benchmark metrics"""
     name: str
@@ -30,80 +32,94 @@ class BenchmarkMetrics:
     count: Optional[int] = None
 
 
+# Latency and throughput patterns fused into one alternation. Each value
+# group is named after the BenchmarkMetrics field it populates.
+_METRIC_RE = re.compile('|'.join((
+    # "P50: 60.40 ms"
+    r'[Pp]50[:\s]+(?P<p50_ms>\d+\.?\d*)\s*(?:ms|us|μs)',
+    r'[Pp]90[:\s]+(?P<p90_ms>\d+\.?\d*)\s*(?:ms|us|μs)',
+    r'[Pp]99[:\s]+(?P<p99_ms>\d+\.?\d*)\s*(?:ms|us|μs)',
+    r'[Mm]ax[:\s]+(?P<max_ms>\d+\.?\d*)\s*(?:ms|us|μs)',
+    # "Throughput: 120.5 qps"
+    r'[Tt]hroughput[:\s]+(?P<throughput_qps>\d+\.?\d*)\s*(?:qps|queries/sec|samples/sec)',
+)))
+
+# Pattern for test names
+_TEST_RE = re.compile(r'(?:TEST_F|BENCHMARK)\([^,]+,\s*(\w+)\)|(\w+):\s+Count:')
+
+# Summary lines, applied to the 'overall' entry
+# "Latency p50: 60.40 ms"
+_SUMMARY_P50_RE = re.compile(r'Latency p50[:\s]+(\d+\.?\d*)\s*ms')
+# "Read Latency p99: 3919.22 ms"
+_SUMMARY_P99_RE = re.compile(r'Read.*p99[:\s]+(\d+\.?\d*)\s*ms')
+# Each summary pattern paired with a literal its matches must contain
+_SUMMARY_PATTERNS = (('Latency p50', _SUMMARY_P50_RE), ('p99', _SUMMARY_P99_RE))
+
+
 def parse_log_file(filepath: Path) -> Dict[str, BenchmarkMetrics]:
     """Parse a benchmark log file and extract metrics."""
     metrics = {}
     
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Pattern for latency lines: "P50: 60.40 ms"
-    p50_pattern = re.compile(r'[Pp]50[:\s]+(\d+\.?\d*)\s*(?:ms|us|μs)')
-    p90_pattern = re.compile(r'[Pp]90[:\s]+(\d+\.?\d*)\s*(?:ms|us|μs)')
-    p99_pattern = re.compile(r'[Pp]99[:\s]+(\d+\.?\d*)\s*(?:ms|us|μs)')
-    max_pattern = re.compile(r'[Mm]ax[:\s]+(\d+\.?\d*)\s*(?:ms|us|μs)')
-    
-    # Pattern for throughput
-    qps_pattern = re.compile(r'[Tt]hroughput[:\s]+(\d+\.?\d*)\s*(?:qps|queries/sec|samples/sec)')
-    
-    # Pattern for test names
-    test_pattern = re.compile(r'(?:TEST_F|BENCHMARK)\([^,]+,\s*(\w+)\)|(\w+):\s+Count:')
+    # Decode once and split in C; benchmark output may contain stray bytes.
+    # An empty log still counts as one empty line, so it gets an 'overall' entry
+    lines = Path(filepath).read_bytes().decode('utf-8', errors='replace').splitlines() or ['']
     
     current_test = "overall"
+    m = None  # Entry for current_test, looked up again only when the test changes
+    # Summary values override per-test values once the whole file is read
+    summary_p50 = None
+    summary_p99 = None
     
-    for line in content.split('\n'):
-        # Check for test name
-        test_match = test_pattern.search(line)
+    for line in lines:
+        # Check for test name, skipping the regex on lines without its literals
+        if 'TEST_F(' in line or 'BENCHMARK(' in line or 'Count:' in line:
+            test_match = _TEST_RE.search(line)
+        else:
+            test_match = None
         if test_match:
             current_test = test_match.group(1) or test_match.group(2) or "overall"
-            if current_test not in metrics:
-                metrics[current_test] = BenchmarkMetrics(name=current_test)
+            m = None
         
         # Extract metrics
-        m = metrics.get(current_test, BenchmarkMetrics(name=current_test))
-        
-        p50_match = p50_pattern.search(line)
-        if p50_match:
-            m.p50_ms = float(p50_match.group(1))
+        if m is None:
+            m = metrics.setdefault(current_test, BenchmarkMetrics(name=current_test))
         
-        p90_match = p90_pattern.search(line)
-        if p90_match:
-            m.p90_ms = float(p90_match.group(1))
-            
-        p99_match = p99_pattern.search(line)
-        if p99_match:
-            m.p99_ms = float(p99_match.group(1))
-            
-        max_match = max_pattern.search(line)
-        if max_match:
-            m.max_ms = float(max_match.group(1))
-            
-        qps_match = qps_pattern.search(line)
-        if qps_match:
-            m.throughput_qps = float(qps_match.group(1))
+        # Walk matches right to left so the leftmost occurrence of each
+        # metric on the line is the one that sticks
+        for match in reversed(list(_METRIC_RE.finditer(line))):
+            field = match.lastgroup
+            setattr(m, field, float(match.group(field)))
         
-        metrics[current_test] = m
-    
-    # Also try to extract from summary lines
-    summary_patterns = [
-        # "Latency p50: 60.40 ms"
-        re.compile(r'Latency p50[:\s]+(\d+\.?\d*)\s*ms'),
-        # "Read Latency p99: 3919.22 ms"
-        re.compile(r'Read.*p99[:\s]+(\d+\.?\d*)\s*ms'),
-    ]
-    
-    for line in content.split('\n'):
-        for pattern in summary_patterns:
+        # Also try to extract from summary lines
+        lowered = None
+        for literal, pattern in _SUMMARY_PATTERNS:
+            if literal not in line:
+                continue
             match = pattern.search(line)
-            if match and 'overall' in metrics:
-                if 'p50' in line.lower():
-                    metrics['overall'].p50_ms = float(match.group(1))
-                elif 'p99' in line.lower():
-                    metrics['overall'].p99_ms = float(match.group(1))
+            if match:
+                if lowered is None:
+                    lowered = line.lower()
+                if 'p50' in lowered:
+                    summary_p50 = float(match.group(1))
+                elif 'p99' in lowered:
+                    summary_p99 = float(match.group(1))
+    
+    if 'overall' in metrics:
+        if summary_p50 is not None:
+            metrics['overall'].p50_ms = summary_p50
+        if summary_p99 is not None:
+            metrics['overall'].p99_ms = summary_p99
     
     return metrics
 
 
+# Only emit ANSI colors when writing to a terminal
+USE_COLOR = sys.stdout.isatty()
+GREEN = '\033[92m' if USE_COLOR else ''
+RED = '\033[91m' if USE_COLOR else ''
+RESET = '\033[0m' if USE_COLOR else ''
+
+
 def calculate_improvement(baseline: Optional[float], optimized: Optional[float], 
                           lower_is_better: bool = True) -> Tuple[Optional[float], str]:
     """Calculate improvement percentage and format string."""
@@ -120,35 +136,38 @@ def calculate_improvement(baseline: Optional[float], optimized: Optional[float],
         improvement = ((optimized - baseline) / baseline) * 100
         speedup = optimized / baseline if baseline > 0 else float('inf')
     
-    if improvement > 0:
-        color = '\033[92m'  # Green
-        sign = '+'
-    else:
-        color = '\033[91m'  # Red
-        sign = ''
-    
-    reset = '\033[0m'
+    sign = '+' if improvement > 0 else ''
     
-    if abs(speedup) > 1.1:
-        return improvement, f"{color}{sign}{improvement:.1f}% ({speedup:.1f}x){reset}"
-    else:
+    if abs(speedup) <= 1.1:
         return improvement, f"{sign}{improvement:.1f}%"
+    if not USE_COLOR:
+        return improvement, f"{sign}{improvement:.1f}% ({speedup:.1f}x)"
+    
+    color = GREEN if improvement > 0 else RED
+    return improvement, f"{color}{sign}{improvement:.1f}% ({speedup:.1f}x){RESET}"
+
+
+# Report row layouts, shared by every row of a table
+LATENCY_ROW_FMT = "  {name:<23.23} {label}: {base:>8} → {opt:>8} ms  {imp}\n"
+QPS_ROW_FMT = "  {name:<23.23} {base:>8} → {opt:>8} qps  {imp}\n"
+SLA_ROW_FMT = "  {name:<30}: {value:>10} [{status}]\n"
 
 
 def compare_metrics(baseline: Dict[str, BenchmarkMetrics], 
                    optimized: Dict[str, BenchmarkMetrics]) -> str:
     """Generate comparison report."""
-    lines = []
-    lines.append("=" * 80)
-    lines.append("BENCHMARK COMPARISON REPORT")
-    lines.append("=" * 80)
-    lines.append("")
+    buf = io.StringIO()
+    w = buf.write
+    w("=" * 80 + "\n")
+    w("BENCHMARK COMPARISON REPORT\n")
+    w("=" * 80 + "\n")
+    w("\n")
     
     # Overall summary table
-    lines.append("LATENCY COMPARISON (lower is better)")
-    lines.append("-" * 80)
-    lines.append(f"{'Metric':<25} {'Baseline':<15} {'Optimized':<15} {'Improvement':<25}")
-    lines.append("-" * 80)
+    w("LATENCY COMPARISON (lower is better)\n")
+    w("-" * 80 + "\n")
+    w(f"{'Metric':<25} {'Baseline':<15} {'Optimized':<15} {'Improvement':<25}\n")
+    w("-" * 80 + "\n")
     
     # Aggregate key metrics
     key_metrics = ['overall', 'SLA_Compliance', 'RangeQuery_1Hour_1MinStep', 
@@ -161,15 +180,17 @@ def compare_metrics(baseline: Dict[str, BenchmarkMetrics],
             
             # p50
             _, p50_imp = calculate_improvement(b.p50_ms, o.p50_ms, lower_is_better=True)
-            lines.append(f"  {test_name[:23]:<23} P50: {b.p50_ms or 'N/A':>8} → {o.p50_ms or 'N/A':>8} ms  {p50_imp}")
+            w(LATENCY_ROW_FMT.format(name=test_name, label='P50', base=b.p50_ms or 'N/A',
+                                     opt=o.p50_ms or 'N/A', imp=p50_imp))
             
             # p99
             _, p99_imp = calculate_improvement(b.p99_ms, o.p99_ms, lower_is_better=True)
-            lines.append(f"  {'':<23} P99: {b.p99_ms or 'N/A':>8} → {o.p99_ms or 'N/A':>8} ms  {p99_imp}")
+            w(LATENCY_ROW_FMT.format(name='', label='P99', base=b.p99_ms or 'N/A',
+                                     opt=o.p99_ms or 'N/A', imp=p99_imp))
     
-    lines.append("")
-    lines.append("THROUGHPUT COMPARISON (higher is better)")
-    lines.append("-" * 80)
+    w("\n")
+    w("THROUGHPUT COMPARISON (higher is better)\n")
+    w("-" * 80 + "\n")
     
     for test_name in key_metrics:
         if test_name in baseline or test_name in optimized:
@@ -178,12 +199,13 @@ def compare_metrics(baseline: Dict[str, BenchmarkMetrics],
             
             if b.throughput_qps is not None or o.throughput_qps is not None:
                 _, qps_imp = calculate_improvement(b.throughput_qps, o.throughput_qps, lower_is_better=False)
-                lines.append(f"  {test_name[:23]:<23} {b.throughput_qps or 'N/A':>8} → {o.throughput_qps or 'N/A':>8} qps  {qps_imp}")
+                w(QPS_ROW_FMT.format(name=test_name, base=b.throughput_qps or 'N/A',
+                                     opt=o.throughput_qps or 'N/A', imp=qps_imp))
     
-    lines.append("")
-    lines.append("=" * 80)
-    lines.append("SLA TARGET STATUS")
-    lines.append("=" * 80)
+    w("\n")
+    w("=" * 80 + "\n")
+    w("SLA TARGET STATUS\n")
+    w("=" * 80 + "\n")
     
     # Check SLA compliance
     sla_metrics = optimized.get('SLA_Compliance') or optimized.get('overall')
@@ -198,16 +220,16 @@ def compare_metrics(baseline: Dict[str, BenchmarkMetrics],
             if value is None:
                 status = "N/A"
             elif lower_is_better:
-                status = "\033[92mPASS\033[0m" if value <= target else "\033[91mFAIL\033[0m"
+                status = f"{GREEN}PASS{RESET}" if value <= target else f"{RED}FAIL{RESET}"
             else:
-                status = "\033[92mPASS\033[0m" if value >= target else "\033[91mFAIL\033[0m"
+                status = f"{GREEN}PASS{RESET}" if value >= target else f"{RED}FAIL{RESET}"
             
-            lines.append(f"  {name:<30}: {value or 'N/A':>10} [{status}]")
+            w(SLA_ROW_FMT.format(name=name, value=value or 'N/A', status=status))
     
-    lines.append("")
-    lines.append("=" * 80)
+    w("\n")
+    w("=" * 80)
     
-    return '\n'.join(lines)
+    return buf.getvalue()
 
 
 def main():
@@ -221,15 +243,31 @@ def main():
     if args.dir:
         # Find latest baseline and optimized files
         results_dir = Path(args.dir)
-        baseline_files = sorted(results_dir.glob('*baseline*.log'))
-        optimized_files = sorted(results_dir.glob('*after*.log') or results_dir.glob('*optimized*.log'))
+        baseline_files = []
+        after_files = []
+        optimized_files = []
+        
+        # Classify the directory entries in a single pass
+        if results_dir.is_dir():
+            with os.scandir(results_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith('.log'):
+                        continue
+                    if 'baseline' in name:
+                        baseline_files.append(name)
+                    if 'after' in name:
+                        after_files.append(name)
+                    if 'optimized' in name:
+                        optimized_files.append(name)
         
         if not baseline_files:
             print("No baseline files found in", args.dir)
             sys.exit(1)
         
-        baseline_path = baseline_files[-1]  # Latest
-        optimized_path = optimized_files[-1] if optimized_files else baseline_files[-1]
+        # File names carry a timestamp, so the greatest name is the latest
+        baseline_path = results_dir / max(baseline_files)
+        optimized_path = results_dir / max(after_files or optimized_files or baseline_files)
         
         print(f"Comparing: {baseline_path.name} vs {optimized_path.name}")
         print()
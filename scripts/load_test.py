@@ -1,44 +1,88 @@
+import asyncio
+import os
 import requests
 import time
 import random
-import threading
-
-def send_metrics(start_index, count):
-    url = "http://localhost:9993/api/v1/write"
-    for i in range(count):
-        idx = start_index + i
-        timestamp = int(time.time() * 1000)
-        
-        # Create a payload simulating Prometheus form data
-        # Note: The server expects form-urlencoded data for simple writes based on previous curl examples
-        # metric_name, labels (json), value, timestamp
-        
-        data = {
-            "metric_name": f"load_test_metric_{idx}",
-            "labels": f'{{"job":"load_test","instance":"server_{idx % 10}"}}',
-            "value": str(random.randint(0, 1000)),
-            "timestamp": str(timestamp)
-        }
-        
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote_plus
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Fall back to threads + requests
+
+URL = "http://localhost:9993/api/v1/write"
+MAX_IN_FLIGHT = 256
+# I/O-bound, so run several workers per core in the threaded fallback
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+# The labels only vary by instance, so quote each variant once up front
+LABELS = [quote_plus(f'{{"job":"load_test","instance":"server_{i}"}}') for i in range(10)]
+
+def build_payload(idx):
+    timestamp = int(time.time() * 1000)
+
+    # Create a payload simulating Prometheus form data
+    # Note: The server expects form-urlencoded data for simple writes based on previous curl examples
+    # metric_name, labels (json), value, timestamp
+    return (
+        f"metric_name=load_test_metric_{idx}&labels={LABELS[idx % 10]}"
+        f"&value={random.randint(0, 1000)}&timestamp={timestamp}"
+    ).encode()
+
+def send_metric(sess, idx):
+    """Send one write, returning True if the server accepted it."""
+    try:
+        return sess.post(URL, data=build_payload(idx), timeout=1).ok
+    except Exception as e:
+        return False # Counted as a failed write
+
+def send_metrics(total):
+    """Send total writes from a thread pool, returning the number that failed."""
+    # One session shared by all workers, its pool sized so each worker
+    # keeps a connection alive
+    with requests.Session() as sess, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        sess.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+        sess.headers.update(FORM_HEADERS)
+        results = executor.map(lambda idx: send_metric(sess, idx), range(total))
+        return sum(1 for ok in results if not ok)
+
+async def send_metric_async(session, sem, idx):
+    """Send one write, returning True if the server accepted it."""
+    # The timeout starts once a slot is held, so time spent queued behind
+    # other requests does not count against it
+    async with sem:
         try:
-            requests.post(url, data=data, timeout=1)
+            async with session.post(URL, data=build_payload(idx),
+                                    timeout=aiohttp.ClientTimeout(total=1)) as resp:
+                await resp.read()  # Release the connection back to the pool
+                return resp.status < 400
         except Exception as e:
-            pass # Ignore errors for load testing
-
-threads = []
-num_threads = 4
-metrics_per_thread = 250
+            return False # Counted as a failed write
 
-print(f"Starting load test with {num_threads} threads, {metrics_per_thread} metrics each...")
-start_time = time.time()
+async def send_metrics_async(total):
+    """Send total writes from one event loop, returning the number that failed."""
+    # One session on one event loop so keep-alive connections are shared
+    # by every request; the semaphore bounds requests in flight
+    sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+    connector = aiohttp.TCPConnector(limit=MAX_IN_FLIGHT, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector, headers=FORM_HEADERS) as session:
+        results = await asyncio.gather(*(send_metric_async(session, sem, idx) for idx in range(total)))
+    return results.count(False)
 
-for i in range(num_threads):
-    t = threading.Thread(target=send_metrics, args=(i * metrics_per_thread, metrics_per_thread))
-    threads.append(t)
-    t.start()
+num_metrics = 1000
 
-for t in threads:
-    t.join()
+if aiohttp is not None:
+    print(f"Starting async load test with {num_metrics} metrics...")
+    start_time = time.time()
+    failed = asyncio.run(send_metrics_async(num_metrics))
+else:
+    print(f"Starting load test with {MAX_WORKERS} threads, {num_metrics} metrics...")
+    start_time = time.time()
+    failed = send_metrics(num_metrics)
 
 duration = time.time() - start_time
-print(f"Load test completed in {duration:.2f} seconds")
+print(f"Load test completed in {duration:.2f} seconds, {failed}/{num_metrics} writes failed")
@@ -11,7 +11,7 @@ Otherwise, it will run in interactive mode.
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Status indicators
 STATUS = {
@@ -22,32 +22,26 @@ STATUS = {
     'blocked': '[⚠️]'
 }
 
-def parse_test_plan(content: str) -> List[Tuple[str, str, int]]:
-    """Parse test plan and return list of (section, test, line_number)."""
-    tests = []
-    current_section = ''
-    for i, line in enumerate(content.splitlines()):
-        if line.startswith('###'):
-            current_section = line.strip('# ')
-        elif line.strip().startswith('- ['):
-            test = line.split(']', 1)[1].strip()
-            tests.append((current_section, test, i))
-    return tests
+# Reverse lookup from a line's status marker to its summary bucket
+MARKER_TO_BUCKET = {marker: bucket for bucket, marker in STATUS.items()}
 
-def update_test_status(content: str, updates: Dict[Tuple[str, str], str]) -> str:
-    """Update test status in content based on updates dict."""
-    lines = content.splitlines()
-    tests = parse_test_plan(content)
-    
-    for section, test, line_num in tests:
-        if (section, test) in updates:
-            new_status = updates[(section, test)]
-            lines[line_num] = f'- {new_status}{test}'
-    
-    return '\n'.join(lines)
+def is_test_line(line: str) -> bool:
+    """Check for a '- [' test entry after any indentation, without copying the line."""
+    indent = 0
+    while indent < len(line) and line[indent] in ' \t':
+        indent += 1
+    return line.startswith('- [', indent)
 
-def calculate_summary(content: str) -> Dict[str, int]:
-    """Calculate test execution summary."""
+def scan(content: str, updates: Optional[Dict[Tuple[str, str], str]] = None
+         ) -> Tuple[List[Tuple[str, str, int]], Dict[str, int], List[str]]:
+    """Scan test plan once, applying updates and counting statuses as it goes.
+
+    Returns (tests, summary, lines) where tests is the list of
+    (section, test, line_number), summary counts the statuses after updates
+    are applied, and lines is the updated content split into lines.
+    """
+    updates = updates or {}
+    tests = []
     summary = {
         'total': 0,
         'passed': 0,
@@ -57,25 +51,45 @@ def calculate_summary(content: str) -> Dict[str, int]:
         'not_started': 0
     }
     
-    for line in content.splitlines():
-        if line.strip().startswith('- ['):
+    lines = content.splitlines()
+    current_section = ''
+    for i, line in enumerate(lines):
+        if line.startswith('###'):
+            current_section = line.strip('# ')
+        elif is_test_line(line):
+            test = line.split(']', 1)[1].strip()
+            tests.append((current_section, test, i))
+            
+            new_status = updates.get((current_section, test))
+            if new_status is not None:
+                line = lines[i] = f'- {new_status}{test}'
+            
             summary['total'] += 1
-            if '[✓]' in line:
-                summary['passed'] += 1
-            elif '[❌]' in line:
-                summary['failed'] += 1
-            elif '[⚠️]' in line:
-                summary['blocked'] += 1
-            elif '[🟡]' in line:
-                summary['in_progress'] += 1
-            else:
-                summary['not_started'] += 1
+            start = line.find('[')
+            marker = line[start:line.find(']', start) + 1]
+            summary[MARKER_TO_BUCKET.get(marker, 'not_started')] += 1
     
-    return summary
+    return tests, summary, lines
 
-def update_summary(content: str) -> str:
-    """Update summary section in test plan."""
-    summary = calculate_summary(content)
+def parse_test_plan(content: str) -> List[Tuple[str, str, int]]:
+    """Parse test plan and return list of (section, test, line_number)."""
+    return scan(content)[0]
+
+def update_test_status(content: str, updates: Dict[Tuple[str, str], str]) -> str:
+    """Update test status in content based on updates dict."""
+    return '\n'.join(scan(content, updates)[2])
+
+def calculate_summary(content: str) -> Dict[str, int]:
+    """Calculate test execution summary."""
+    return scan(content)[1]
+
+def update_summary(content: str, summary: Optional[Dict[str, int]] = None) -> str:
+    """Update summary section in test plan.
+    
+    If summary is not given it is calculated from content.
+    """
+    if summary is None:
+        summary = calculate_summary(content)
     coverage = (summary['passed'] / summary['total']) * 100 if summary['total'] > 0 else 0
     
     summary_text = f"""## Test Execution Summary
@@ -95,12 +109,9 @@ def parse_test_output(output_file: str) -> Dict[Tuple[str, str], str]:
     # Add logic to parse test output format
     return updates
 
-def interactive_update() -> Dict[Tuple[str, str], str]:
-    """Interactively update test status."""
+def interactive_update(tests: List[Tuple[str, str, int]]) -> Dict[Tuple[str, str], str]:
+    """Interactively update status of the given (section, test, line_number) tests."""
     updates = {}
-    test_plan_path = Path('TESTPLAN.md')
-    content = test_plan_path.read_text()
-    tests = parse_test_plan(content)
     
     print("\nTest Status Update")
     print("=================")
@@ -148,11 +159,12 @@ def main():
         updates = parse_test_output(str(test_output_path))
     else:
         # Interactive updates
-        updates = interactive_update()
+        updates = interactive_update(parse_test_plan(content))
     
     if updates:
-        content = update_test_status(content, updates)
-        content = update_summary(content)
+        # One pass applies the updates and counts the resulting statuses
+        _, summary, lines = scan(content, updates)
+        content = update_summary('\n'.join(lines), summary)
         test_plan_path.write_text(content)
         print("\nTest plan updated successfully!")
     else: